@@ -1,14 +1,19 @@
 import h5py
-from tqdm import tqdm
+from functools import lru_cache, cached_property
+from concurrent.futures import ThreadPoolExecutor, Future
+from collections import OrderedDict
 import numpy as np
 from numpy import argsort
 from .subgroup import Subgroup
-from .helper_functions import quick_search
+from .lazy_dataset import LazyDataset
+from .helper_functions import quick_search, find_positions, shrink_index_dtype
 from astropy.cosmology import FlatLambdaCDM
 
 class Database:
 
-    def __init__(self, path):
+    def __init__(self, path, chunk_cache_size=512 * 1024**2, chunk_cache_slots=1048583,
+                 materialize_threshold=64 * 1024**2, slice_cache_size=1024, prefetch=True,
+                 max_cache_bytes=1024**3, selection_cache_size=1024, galaxyID_map=False):
         '''
         Creates an EAGLE database object.
 
@@ -16,6 +21,27 @@ class Database:
         ----------
         database_path : str
             Path to where the database is located.
+        chunk_cache_size : int, opt
+            Size in bytes of the HDF5 chunk cache used for each dataset.
+        chunk_cache_slots : int, opt
+            Number of slots of the HDF5 chunk cache. Should be a prime number.
+        materialize_threshold : int, opt
+            Datasets smaller than this many bytes are read in full when first
+            accessed. Larger ones are only read when indexed.
+        slice_cache_size : int, opt
+            Maximum number of contiguous dataset slices kept in memory.
+        prefetch : bool, opt
+            Whether to start reading, in the background, the merger tree datasets
+            needed to track subgroups.
+        max_cache_bytes : int, opt
+            Maximum number of bytes of Subhalo datasets kept in memory, shared by 
+            all subgroups. The least recently used ones are dropped beyond this.
+        selection_cache_size : int, opt
+            Maximum number of non-contiguous dataset selections kept in memory.
+        galaxyID_map : bool, opt
+            Whether to look up individual galaxyIDs through a dictionary over all
+            entries, rather than a sorted search. This is faster for many repeated
+            lookups, but uses over 100 bytes of memory per entry.
 
         Returns
         --------
@@ -26,10 +52,35 @@ class Database:
         self._path = path
 
         # Open database file
-        self.file = h5py.File(self._path, 'r') 
+        self.file = h5py.File(self._path, 'r', rdcc_nbytes=chunk_cache_size,
+                              rdcc_nslots=chunk_cache_slots, rdcc_w0=0.75) 
         
-        # Dict where data is stored
+        # Dict where (lazily-read) datasets are stored
         self.data = {}
+        self._materialize_threshold = materialize_threshold
+
+        # Subhalo datasets held in memory, from least to most recently used
+        self._subhalo_cache   = OrderedDict()
+        self._max_cache_bytes = max_cache_bytes
+
+        # Hash map from galaxyID to array index, built on first use if requested
+        self._use_galaxyID_map = galaxyID_map
+        self._galaxyID_map     = None
+
+        # Threads used to read datasets in the background
+        self._executor = ThreadPoolExecutor(max_workers=4)
+
+        # Cache of recently read contiguous slices
+        self._cached_slice = lru_cache(maxsize=slice_cache_size)(self._read_slice)
+
+        # Cache of recently read non-contiguous selections, from least to most recently used
+        self._selection_cache      = OrderedDict()
+        self._selection_cache_size = selection_cache_size
+
+        # Start reading the datasets that any Subgroup will need
+        if prefetch:
+            self.prefetch(['MergerTree/GalaxyID', 'MergerTree/nodeIndex', 'MergerTree/TopLeafID',
+                           'MergerTree/LastProgID', 'MergerTree/DescendantID', 'Subhalo/SnapNum'])
 
         # Get properties and info of the simulation used to build dataset
         self.get_properties()
@@ -40,14 +91,27 @@ class Database:
         # Specify cosmology and get age of the universe at output snapshots
         self.set_cosmology()
         self.get_tUniverse()
-
-        # Generate sorter array for GalaxyID to speed up array search further
-        # down the line 
-        self.get_galaxyID_sorter()
     
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        '''
+        Closes the database file. Values that have already been read into
+        memory remain available.
+        '''
+        self._executor.shutdown(wait=True)
+        self._cached_slice.cache_clear()
+        self._selection_cache.clear()
+        self.file.close()
+
     def load(self, group_name):
         '''
-        Helper function used to load data if it is not available yet.
+        Helper function used to get a handle to a dataset if it is not available yet.
+        No values are read from disk until they are indexed or materialized.
 
         Parameters
         -----------
@@ -60,22 +124,213 @@ class Database:
         '''
 
         if group_name not in self.data:
-            try: 
-                self.data[group_name] = self.file[group_name][()]
-            except:
+            dataset = self.file.get(group_name)
+            if not isinstance(dataset, h5py.Dataset):
                 raise KeyError('No group with specified name is present in this file.')
+            self.data[group_name] = LazyDataset(dataset)
+
+            # Small datasets are cheaper to read in one go
+            if self.data[group_name].nbytes <= self._materialize_threshold:
+                self.data[group_name].materialize()
+                if group_name.startswith('Subhalo/'):
+                    self._cache_subhalo_dataset(group_name)
+
+    def prefetch(self, group_names):
+        '''
+        Starts reading the specified datasets into memory in the background. 
+        Accessing them before they have been read waits until they are available.
+        Names that are not datasets of this file are skipped, so they only raise
+        an error if they are used.
+
+        Parameters
+        -----------
+        group_names : list of str
+            Names of the groups we want to load data from
+
+        Returns
+        --------
+        None
+        '''
+        for group_name in group_names:
+            if group_name not in self.data:
+                dataset = self.file.get(group_name)
+                if not isinstance(dataset, h5py.Dataset):
+                    continue
+                self.data[group_name] = LazyDataset(dataset)
+            self._executor.submit(self.data[group_name].materialize)
+
+    def materialize(self, group_name):
+        '''
+        Reads the full dataset into memory, for the cases where all of its
+        values are needed (e.g. sorting or searching through them).
+
+        Parameters
+        -----------
+        group_name : str
+            Name of the group we want to load data from
+
+        Returns
+        --------
+        ArrayType
+            The values of the dataset.
+        '''
+        return self[group_name].materialize()
+
+    def get_subhalo_array(self, property):
+        '''
+        Returns all the values of a Subhalo property. They are kept in memory
+        and shared by all subgroups, within the max_cache_bytes budget.
+
+        Parameters
+        -----------
+        property : str
+            Name of the Subhalo property, e.g. Mass.
+
+        Returns
+        --------
+        ArrayType
+            The values of the property for every subhalo in the database.
+        '''
+        group_name = self.get_subhalo_group_name(property)
+        array      = self.materialize(group_name)
+        self._cache_subhalo_dataset(group_name)
+
+        return array
+
+    def _cache_subhalo_dataset(self, group_name):
+        # Marks an in-memory Subhalo dataset as the most recently used one, and
+        # drops the least recently used ones that exceed the memory budget
+        self._subhalo_cache[group_name] = self.data[group_name].nbytes
+        self._subhalo_cache.move_to_end(group_name)
+
+        cached_bytes = sum(self._subhalo_cache.values())
+        while cached_bytes > self._max_cache_bytes and len(self._subhalo_cache) > 1:
+            oldest_name, oldest_bytes = self._subhalo_cache.popitem(last=False)
+            self.data[oldest_name].release()
+            cached_bytes -= oldest_bytes
 
     def __getitem__(self, group_name):
         self.load(group_name)
+        if group_name in self._subhalo_cache:
+            self._subhalo_cache.move_to_end(group_name)
         return self.data[group_name]
 
+    def _get_slice(self, group_name, start, stop):
+        # Copy of a contiguous range of entries, so callers modifying it do not 
+        # change the cached values shared with other subgroups
+        return self._cached_slice(group_name, start, stop).copy()
+
+    def _read_slice(self, group_name, start, stop):
+        '''
+        Reads a contiguous range of entries of a dataset. Accessed through
+        _get_slice, which caches the most recently used ranges.
+
+        Parameters
+        -----------
+        group_name : str
+            Name of the group we want to load data from
+        start : int
+            First entry to read.
+        stop : int
+            Entry where reading stops (not included).
+
+        Returns
+        --------
+        ArrayType
+            The values of the dataset within the specified range.
+        '''
+        dataset = self[group_name]
+        values  = np.empty((stop - start,) + dataset.shape[1:], dtype=dataset.dtype)
+
+        # Read straight into a buffer of its own, so cached ranges never keep
+        # alive a whole dataset held in memory
+        if dataset.is_materialized:
+            values[...] = dataset[start:stop]
+        else:
+            dataset.dataset.read_direct(values, source_sel=np.s_[start:stop])
+
+        return values
+
+    def get_selection(self, group_name, positional_index, order=None):
+        '''
+        Reads the specified entries of a dataset. The most recently used selections
+        are cached, so subgroups sharing a merger tree do not read them again.
+
+        Parameters
+        -----------
+        group_name : str
+            Name of the group we want to load data from
+        positional_index : ArrayType
+            Array indices of the entries to read.
+        order : ArrayType, opt
+            Indices that sort positional_index, if already known.
+
+        Returns
+        --------
+        ArrayType
+            The values of the dataset at the specified indices. These are a copy
+            of the cached ones, so they can be modified freely.
+        '''
+        key    = (group_name, positional_index.tobytes())
+        values = self._selection_cache.get(key)
+        if values is not None:
+            self._selection_cache.move_to_end(key)
+
+            # Wait for selections still being read in the background
+            if isinstance(values, Future):
+                values = values.result()
+                self._selection_cache[key] = values
+            return values.copy()
+
+        values = self[group_name].take(positional_index, order)
+        self._add_selection(key, values)
+
+        return values.copy()
+
+    def prefetch_selection(self, group_name, positional_index, order=None):
+        '''
+        Starts reading the specified entries of a dataset in the background. They
+        are retrieved through get_selection once needed.
+
+        Parameters
+        -----------
+        group_name : str
+            Name of the group we want to load data from
+        positional_index : ArrayType
+            Array indices of the entries to read.
+        order : ArrayType, opt
+            Indices that sort positional_index, if already known.
+
+        Returns
+        --------
+        None
+        '''
+        key = (group_name, positional_index.tobytes())
+        if key not in self._selection_cache:
+            self._add_selection(key, self._executor.submit(self[group_name].take, positional_index, order))
+
+    def has_selection(self, group_name, positional_index):
+        # Whether the entries are in the selection cache, or being read into it
+        return (group_name, positional_index.tobytes()) in self._selection_cache
+
+    def _add_selection(self, key, values):
+        # Adds values (or a Future that returns them) to the selection cache,
+        # dropping the least recently used one if it is full
+        self._selection_cache[key] = values
+        if len(self._selection_cache) > self._selection_cache_size:
+            self._selection_cache.popitem(last=False)
+
     def get_properties(self):
         '''
-        Creates dictionary containing information about the simulation.        
+        Makes available information about the simulation, as a dictionary-like
+        view of the Header attributes. These are read when accessed.
         '''
-        self.properties = {}
-        for key, value in self.file['Header'].attrs.items():
-            self.properties[key] = value 
+        self.properties = self.file['Header'].attrs
+
+    @cached_property
+    def properties_dict(self):
+        # Copy of all the simulation information, e.g. for pickling
+        return dict(self.properties)
 
     def get_scale_factors(self):
         '''
@@ -91,27 +346,131 @@ class Database:
 
     def get_galaxyID_sorter(self):
         '''
-        Creates a sorter array to sort galaxyID values in ascending order.
-        Used for searching more quickly further down the line. 
+        Returns a sorter array to sort galaxyID values in ascending order.
+        Used for searching more quickly further down the line. No sorter is
+        needed (None) if GalaxyID is already stored in ascending order, which
+        can be flagged through a 'sorted' attribute of the dataset.
         '''
-        self._galaxyID_sorter = argsort(self['MergerTree/GalaxyID'])
+        if self.file['MergerTree/GalaxyID'].attrs.get('sorted', False):
+            return None
+
+        galaxyIDs = self.materialize('MergerTree/GalaxyID')
+        if np.all(galaxyIDs[1:] > galaxyIDs[:-1]):
+            return None
+
+        # Kept as intp, as np.searchsorted copies sorters of any other dtype on every call
+        return argsort(galaxyIDs, kind='stable')
+
+    @cached_property
+    def galaxyID_sorter(self):
+        # Only generated when first needed
+        return self.get_galaxyID_sorter()
+
+    @cached_property
+    def subhalo_properties(self):
+        # Path to the dataset of each property available in the Subhalo group
+        return {name: 'Subhalo/%s'%name for name in self.file['Subhalo'].keys()}
+
+    def get_subhalo_group_name(self, property):
+        '''
+        Returns the path to the dataset of a Subhalo property. Paths of the properties
+        present in the file are built only once.
+        '''
+        group_name = self.subhalo_properties.get(property)
+        if group_name is None:
+            group_name = 'Subhalo/%s'%property
+        return group_name
+
+    @cached_property
+    def nodeIndex_sorter(self):
+        # Sorter array for nodeIndex, which is not stored in ascending order. Kept as
+        # intp, as it is passed to np.searchsorted
+        return argsort(self.materialize('MergerTree/nodeIndex'), kind='stable')
+
+    def get_snapshot_offsets(self):
+        '''
+        Returns where the entries of each snapshot start in Subhalo/SnapNum and how
+        many of them there are, so subgroups can be located without scanning
+        the whole dataset. If SnapNum is not stored in ascending order, a (stable)
+        sorter array is also returned, which preserves the order of subgroups within 
+        a snapshot. Otherwise, the sorter is None.
+        '''
+        snap_numbers = self.materialize('Subhalo/SnapNum')
+
+        if np.all(snap_numbers[1:] >= snap_numbers[:-1]):
+            snap_sorter         = None
+            sorted_snap_numbers = snap_numbers
+        else:
+            snap_sorter         = shrink_index_dtype(argsort(snap_numbers, kind='stable'))
+            sorted_snap_numbers = snap_numbers[snap_sorter]
+
+        offsets = np.searchsorted(sorted_snap_numbers, np.arange(self.number_snapshots + 1))
+
+        return offsets[:-1], np.diff(offsets), snap_sorter
+
+    @cached_property
+    def _snapshot_offsets(self):
+        # Only generated when first needed
+        return self.get_snapshot_offsets()
+
+    def get_galaxyID_map(self):
+        '''
+        Creates a dictionary mapping each galaxyID to the array index where it is
+        stored. Used for constant-time lookups of individual galaxyIDs, if enabled
+        through the galaxyID_map option.
+        '''
+        galaxyIDs = self.materialize('MergerTree/GalaxyID')
+        self._galaxyID_map = dict(zip(galaxyIDs.tolist(), range(len(galaxyIDs))))
+
+    def get_descendant_positional_index(self):
+        '''
+        Returns, for each entry of the database, the array index where its descendant
+        is stored, or -1 if it has no descendant. Following these indices walks 
+        down a merger tree without having to search for galaxyIDs.
+        '''
+        galaxyIDs     = self.materialize('MergerTree/GalaxyID')
+        descendantIDs = self.materialize('MergerTree/DescendantID')
+
+        return shrink_index_dtype(find_positions(galaxyIDs, descendantIDs, self.galaxyID_sorter))
+
+    @cached_property
+    def descendant_positional_index(self):
+        # Only generated when first needed
+        return self.get_descendant_positional_index()
 
     def set_cosmology(self):
         self.cosmology = FlatLambdaCDM(H0=self.properties['HubbleParam'] * 100, Om0=self.properties['Omega0'])
 
     def get_tUniverse(self):
-        # Given in Gyrs
-        self.tUniverse = self.cosmology.age(self.redshifts).value
+        # Given in Gyrs. Use the analytic age of a flat universe with matter and a
+        # cosmological constant, rather than integrating numerically for each redshift.
+        Om0 = self.cosmology.Om0
+        if 0 < Om0 < 1:
+            Ode0 = 1 - Om0
+            self.tUniverse = (2 * self.cosmology.hubble_time.value / (3 * np.sqrt(Ode0))
+                              * np.arcsinh(np.sqrt(Ode0 / Om0) * (1 + self.redshifts)**-1.5))
+        else:
+            self.tUniverse = self.cosmology.age(self.redshifts).value
 
     def get_all_nodeIndex(self):
         '''
         Returns a list of lists, each holding the nodeIndex for a given snapshot number. 
         Useful for converting between nodeIndex and subgroup number + snapshot_number
         '''
-        print ('Creating table for quick identification of subgroup numbers')
-        self._all_nodeIndex = []
-        for snap in tqdm(range(self.number_snapshots)):
-            self._all_nodeIndex.append(self['MergerTree/nodeIndex'][self['MergerTree/nodeIndex'] // 1e12 == snap])
+        nodeIndex = self.materialize('MergerTree/nodeIndex')
+
+        # Partition nodeIndex by snapshot in a single pass, keeping the order
+        # within each snapshot
+        snapshot_numbers = (nodeIndex // np.int64(10**12)).astype(np.min_scalar_type(self.number_snapshots))
+        order = argsort(snapshot_numbers, kind='stable')
+        edges = np.searchsorted(snapshot_numbers[order], np.arange(self.number_snapshots + 1))
+
+        return [nodeIndex[order[edges[snap]:edges[snap+1]]] for snap in range(self.number_snapshots)]
+
+    @cached_property
+    def _all_nodeIndex(self):
+        # Only generated when first needed
+        return self.get_all_nodeIndex()
 
     def track_subgroup(self, subgroup_number, snap_number):
         '''
@@ -127,14 +486,65 @@ class Database:
         self.subgroup = Subgroup(self, subgroup_number, snap_number)
         return self.subgroup
 
+    def track_subgroups(self, subgroup_numbers, snap_numbers):
+        '''
+        Creates a list of Subgroup classes, sharing the lookups of their
+        merger tree information.
+
+        Parameters
+        ----------
+        subgroup_numbers : ArrayType
+            Absolute position of each subgroup in the subfind catalogue.
+        snap_numbers : ArrayType
+            Number of the snapshot where each subgroup is located.
+        '''
+        return Subgroup.from_batch(self, subgroup_numbers, snap_numbers)
+
     #===========================================================
     # Methods to convert among nodeIndex,
     # snapshot_number + subgroup, galaxyID
     #===========================================================
 
-    def galaxyID_to_nodeIndex(self, galaxyID):
+    def subgroup_to_positional_index(self, subgroup_number, snapshot_number):
         '''
-        Returns the nodeIndex corresponding to this galaxyID. 
+        Returns the array index where the specified combination of subgroup + snapshot
+        number is stored in the database.
+
+        Parameters
+        -----------
+        subgroup_number : int or ArrayType
+            The positional index of this group in the corresponding SUBFIND catalogue.
+        snapshot_number : int or ArrayType
+            The snapshot where this object exists.
+
+        Returns
+        -----------
+        int or ArrayType
+            The array index of the specified group.
+        '''
+        snap_start, snap_count, snap_sorter = self._snapshot_offsets
+
+        if np.ndim(subgroup_number) == 0 and np.ndim(snapshot_number) == 0:
+            if not (0 <= snapshot_number < self.number_snapshots and 
+                    0 <= subgroup_number < snap_count[snapshot_number]):
+                raise IndexError('Subgroup %d does not exist in snapshot %d.'%(subgroup_number, snapshot_number))
+        else:
+            subgroup_number = np.asarray(subgroup_number)
+            snapshot_number = np.asarray(snapshot_number)
+            if np.any((snapshot_number < 0) | (snapshot_number >= self.number_snapshots)):
+                raise IndexError('One or more subgroups do not exist in the specified snapshots.')
+            if np.any((subgroup_number < 0) | (subgroup_number >= snap_count[snapshot_number])):
+                raise IndexError('One or more subgroups do not exist in the specified snapshots.')
+
+        positional_index = snap_start[snapshot_number] + subgroup_number
+        if snap_sorter is not None:
+            positional_index = snap_sorter[positional_index]
+
+        return positional_index
+
+    def galaxyID_to_positional_index(self, galaxyID):
+        '''
+        Returns the array index where the object with this galaxyID is stored.
 
         Parameters
         -----------
@@ -144,9 +554,37 @@ class Database:
         Returns 
         -----------
         int
+            The corresponding array index
+        '''
+        if self._use_galaxyID_map:
+            if self._galaxyID_map is None:
+                self.get_galaxyID_map()
+            return self._galaxyID_map[int(galaxyID)]
+
+        positional_index = quick_search(self.materialize('MergerTree/GalaxyID'), galaxyID, self.galaxyID_sorter)
+        if positional_index is None:
+            raise KeyError(galaxyID)
+        return int(positional_index[0])
+
+    def galaxyID_to_nodeIndex(self, galaxyID):
+        '''
+        Returns the nodeIndex corresponding to this galaxyID. 
+
+        Parameters
+        -----------
+        galaxyID : int or ArrayType
+            The galaxyID of a given object, or an array of them.
+
+        Returns 
+        -----------
+        int or ArrayType
             The correspoding nodeIndex
         '''
-        return self['MergerTree/nodeIndex'][quick_search(self['MergerTree/GalaxyID'], galaxyID, self._galaxyID_sorter)]
+        # Single values return a single nodeIndex
+        if np.ndim(galaxyID) == 0:
+            return self.materialize('MergerTree/nodeIndex')[self.galaxyID_to_positional_index(galaxyID)]
+
+        return self.materialize('MergerTree/nodeIndex')[quick_search(self.materialize('MergerTree/GalaxyID'), galaxyID, self.galaxyID_sorter)]
 
     def nodeIndex_to_galaxyID(self, nodeIndex):
         '''
@@ -154,39 +592,58 @@ class Database:
 
         Parameters
         -----------
-        nodeIndex : int
-            The nodeIndex of a given object.
+        nodeIndex : int or ArrayType
+            The nodeIndex of a given object, or an array of them.
 
         Returns 
         -----------
-        int
+        ArrayType
             The correspoding galaxyID
         '''
-        return self['MergerTree/GalaxyID'][quick_search(self['MergerTree/nodeIndex'], nodeIndex)]
+        return self.materialize('MergerTree/GalaxyID')[quick_search(self.materialize('MergerTree/nodeIndex'), nodeIndex,
+                                                                    self.nodeIndex_sorter)]
 
     def nodeIndex_to_subgroup(self, nodeIndex):
         '''
         Parameters
         -----------
-        nodeIndex : int
-            The nodeIndex of a given object. 
+        nodeIndex : int or ArrayType
+            The nodeIndex of a given object, or an array of them. 
 
         Returns
         ------------
-        tuple or list of tuples 
-            Each input nodeIndex is assigned a tuple containing two integers, 
-            corresponding to its SUBFIND group number and snapshot number, respectively.
+        tuple
+            For a single nodeIndex, a tuple containing two integers, corresponding 
+            to its SUBFIND group number and snapshot number, respectively. For an 
+            array of nodeIndex values, a tuple of two arrays holding the SUBFIND 
+            group numbers and snapshot numbers of each entry. Values not present 
+            in the database are assigned a subgroup number of -1.
         '''     
-        try: self._all_nodeIndex
-        except: self.get_all_nodeIndex()
-        
         if isinstance(nodeIndex,np.ndarray):
-            subgroup_list = []
-            for i in range(len(nodeIndex)):
-                subgroup_list.append(self.nodeIndex_to_subgroup(nodeIndex[i])) 
-            return subgroup_list
+            snapshot_numbers = (nodeIndex // np.int64(10**12)).astype(np.int64)
+            subgroup_numbers = np.full(len(nodeIndex), -1, dtype=np.int64)
+
+            # Group the queries by snapshot, so each snapshot table is searched once
+            order = np.argsort(snapshot_numbers, kind='stable')
+            unique_snaps, starts, counts = np.unique(snapshot_numbers[order], return_index=True,
+                                                    return_counts=True)
+
+            for snap, start, count in zip(unique_snaps, starts, counts):
+                if not 0 <= snap < self.number_snapshots:
+                    continue
+                snap_nodeIndex = self._all_nodeIndex[snap]
+                if len(snap_nodeIndex) == 0:
+                    continue
+
+                group      = order[start:start + count]
+                candidates = np.searchsorted(snap_nodeIndex, nodeIndex[group])
+                candidates = np.minimum(candidates, len(snap_nodeIndex) - 1)
+                found      = snap_nodeIndex[candidates] == nodeIndex[group]
+                subgroup_numbers[group[found]] = candidates[found]
+
+            return subgroup_numbers, snapshot_numbers
         else: 
-            snapshot_number = int(nodeIndex // 1e12)
+            snapshot_number = int(nodeIndex // np.int64(10**12))
             subgroup_number = quick_search(self._all_nodeIndex[snapshot_number], nodeIndex )[0]
             return subgroup_number, snapshot_number
     
@@ -208,7 +665,4 @@ class Database:
             The nodeIndex of the specified group.
             
         '''
-        try: self._all_nodeIndex
-        except: self.get_all_nodeIndex()
-        
         return self._all_nodeIndex[snapshot_number][subgroup_number]
\ No newline at end of file
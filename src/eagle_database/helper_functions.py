@@ -1,4 +1,19 @@
 import numpy as np
+from weakref import ref
+from collections import OrderedDict
+
+# Numba is optional, and only used to speed up large searches
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# Number of search values above which the parallel Numba search is used
+NUMBA_SEARCH_THRESHOLD = 10_000
+
+# Results of recent searches for single values, and how many to keep
+SCALAR_SEARCH_CACHE_SIZE = 65536
+_scalar_search_cache = OrderedDict()
 
 def quick_search(input_array, search_values, sorter_array=None):
     '''
@@ -24,16 +39,265 @@ def quick_search(input_array, search_values, sorter_array=None):
         If no matches have been found, returns None
     '''
 
-    # Search from the left and right sides
-    left  = np.searchsorted(input_array,search_values,side='left' , sorter = sorter_array)
-    right = np.searchsorted(input_array,search_values,side='right', sorter = sorter_array)
+    if not np.isscalar(search_values):
+        return _quick_search(input_array, search_values, sorter_array)
+
+    # Searches for single values are cached, as the same ones tend to be repeated. 
+    # Arrays are identified by id, and weak references make sure the cached
+    # entry refers to the same (still existing) arrays.
+    key    = (id(input_array), id(sorter_array), search_values)
+    cached = _scalar_search_cache.get(key)
+    if cached is not None and cached[0]() is input_array and cached[1]() is sorter_array:
+        _scalar_search_cache.move_to_end(key)
+        positional_index = cached[2]
+    else:
+        positional_index = _quick_search(input_array, search_values, sorter_array)
+
+        _scalar_search_cache[key] = (_weak_reference(input_array), _weak_reference(sorter_array), positional_index)
+        if len(_scalar_search_cache) > SCALAR_SEARCH_CACHE_SIZE:
+            _scalar_search_cache.popitem(last=False)
+
+    # Callers get their own copy, so modifying it does not change the cached result
+    if positional_index is None:
+        return None
+    return positional_index.copy()
+
+def _weak_reference(array):
+    # Weak reference to an array, which also accepts None
+    if array is None:
+        return lambda: None
+    return ref(array)
+
+def _quick_search(input_array, search_values, sorter_array=None):
+    '''
+    Implementation of quick_search, without caching.
+    '''
+
+    # Use the dtype of the searched array when it is safe to do so, so
+    # searchsorted does not need to promote either array
+    search_values = np.asarray(search_values)
+    if search_values.dtype != input_array.dtype and np.can_cast(search_values.dtype, input_array.dtype):
+        search_values = search_values.astype(input_array.dtype)
 
-    # Matches  
-    positional_index = left[left!= right]
+    if len(input_array) == 0:
+        return None
+
+    # Large searches are spread across threads if Numba is available
+    if (njit is not None and search_values.ndim == 1 and len(search_values) > NUMBA_SEARCH_THRESHOLD
+            and search_values.dtype == input_array.dtype):
+        positional_index = np.empty(len(search_values), dtype=np.int64)
+        if sorter_array is not None:
+            _qs_numba_sorter(input_array, sorter_array, search_values, positional_index)
+        else:
+            _qs_numba(input_array, search_values, positional_index)
+        positional_index = positional_index[positional_index != -1]
+
+        if (len(positional_index) != 0):
+            return positional_index
+        return None
+
+    # Search from the left side only, and check whether the values found match
+    candidates = np.searchsorted(input_array,search_values,side='left', sorter = sorter_array)
+    candidates = np.minimum(candidates, len(input_array) - 1)
+    if sorter_array is not None:
+        candidates = sorter_array[candidates]
+
+    # Matches
+    positional_index = candidates[input_array[candidates] == search_values]
 
     # Return array only if one or more matches have been found 
     if (len(positional_index) != 0):
+        return positional_index
+
+
+def find_positions(input_array, search_values, sorter_array=None):
+    '''
+    Finds the positional index of every value in search_values, keeping their
+    order and shape, e.g. to map a whole column of IDs onto array indices. Unlike
+    quick_search, values that are not present are flagged rather than dropped.
+
+    Paramters
+    ----------
+    input_array : ArrayType
+        Array we want to search through
+    search_values : ArrayType
+        Values we want to find inside said array
+    sorter_array : ArrayType, opt
+        Array used to sort input_array, e.g. np.argsort(input_array). 
+        This is used if input_array is not sorted.
+
+    Returns
+    ----------
+    ArrayType
+        Positional index of each value in input_array, or -1 if it is not present.
+    '''
+    search_values    = np.ascontiguousarray(search_values, dtype=input_array.dtype)
+    positional_index = np.empty(len(search_values), dtype=np.int64)
+    if len(input_array) == 0:
+        positional_index[:] = -1
+        return positional_index
+
+    if njit is not None:
         if sorter_array is not None:
-            return sorter_array[positional_index]
+            _qs_numba_sorter(input_array, np.asarray(sorter_array, dtype=np.int64), search_values, positional_index)
         else:
-            return positional_index
\ No newline at end of file
+            _qs_numba(input_array, search_values, positional_index)
+        return positional_index
+
+    # Binary searches through a sorted copy, rather than through the sorter,
+    # which would access input_array at random for every step of every search
+    sorted_array = input_array if sorter_array is None else input_array[sorter_array]
+    candidates   = np.minimum(np.searchsorted(sorted_array, search_values), len(input_array) - 1)
+    found        = sorted_array[candidates] == search_values
+    if sorter_array is not None:
+        candidates = sorter_array[candidates]
+
+    positional_index[:] = np.where(found, candidates, -1)
+    return positional_index
+
+def shrink_index_dtype(index_array):
+    '''
+    Stores an array of array indices (or -1 flags) as int32 if they all fit,
+    halving the memory used and the bytes moved when indexing with it. Only 
+    meant for arrays used as indices: sorters passed to np.searchsorted need 
+    to stay as intp, or they are copied on every search.
+
+    Paramters
+    ----------
+    index_array : ArrayType
+        Array of indices, e.g. as returned by np.argsort.
+
+    Returns
+    ----------
+    ArrayType
+        The same indices, as int32 if possible.
+    '''
+    if len(index_array) < 2**31:
+        return index_array.astype(np.int32)
+    return index_array
+
+def walk_descendants(positional_index, descendant_positional_index, max_length):
+    '''
+    Follows the chain of descendants of an object, using the array index of 
+    the descendant of each object in the database.
+
+    Paramters
+    ----------
+    positional_index : int
+        Array index of the object whose descendants we want to find.
+    descendant_positional_index : ArrayType
+        Array index of the descendant of each object, or -1 if it has none.
+    max_length : int
+        Maximum number of descendants, e.g. the number of snapshots.
+
+    Returns
+    ----------
+    ArrayType
+        Array indices of all the descendants, ordered from the closest one.
+    '''
+    out = np.empty(max_length, dtype=np.int64)
+    number_descendants = _walk_descendants(positional_index, descendant_positional_index, out)
+
+    return out[:number_descendants]
+
+def _walk_descendants(positional_index, descendant_positional_index, out):
+    # Fills out with the chain of descendants and returns its length. 
+    # Compiled with Numba if available.
+    number_descendants = 0
+    next_positional_index = descendant_positional_index[positional_index]
+    while next_positional_index != -1 and number_descendants < len(out):
+        out[number_descendants] = next_positional_index
+        number_descendants += 1
+        next_positional_index = descendant_positional_index[next_positional_index]
+
+    return number_descendants
+
+if njit is not None:
+    _walk_descendants = njit(cache=True)(_walk_descendants)
+
+def first_gap(input_array):
+    '''
+    Finds the first entry of an array of integers that does not follow on
+    from the previous one, i.e. input_array[i] != input_array[i-1] + 1.
+    Compiled with Numba if available, so it stops at the first gap.
+
+    Paramters
+    ----------
+    input_array : ArrayType
+        Array of integers we want to check.
+
+    Returns
+    ----------
+    int
+        Index of the first entry after a gap, or -1 if there are none.
+    '''
+    for i in range(1, len(input_array)):
+        if input_array[i] - input_array[i-1] != 1:
+            return i
+    return -1
+
+if njit is not None:
+    first_gap = njit(cache=True)(first_gap)
+
+def is_contiguous_range(input_array):
+    '''
+    Checks whether an array of integers is a contiguous, ascending range,
+    i.e. it could be replaced by a slice.
+
+    Paramters
+    ----------
+    input_array : ArrayType
+        Array of integers we want to check.
+
+    Returns
+    ----------
+    bool
+        True if input_array == arange(input_array[0], input_array[-1] + 1)
+    '''
+    if len(input_array) == 0:
+        return False
+    return (input_array[-1] - input_array[0] == len(input_array) - 1) and bool(np.all(np.diff(input_array) == 1))
+
+if njit is not None:
+
+    @njit(parallel=True, cache=True)
+    def _qs_numba(sorted_array, search_values, out):
+        '''
+        Binary search of each value in search_values through sorted_array, run in
+        parallel. The positional index of each value is written to out, or -1 if 
+        the value is not present.
+        '''
+        n = len(sorted_array)
+        for i in prange(len(search_values)):
+            value = search_values[i]
+            low, high = 0, n
+            while low < high:
+                middle = (low + high) >> 1
+                if sorted_array[middle] < value:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low < n and sorted_array[low] == value:
+                out[i] = low
+            else:
+                out[i] = -1
+
+    @njit(parallel=True, cache=True)
+    def _qs_numba_sorter(input_array, sorter_array, search_values, out):
+        '''
+        Same as _qs_numba, for an input_array that is sorted through sorter_array.
+        '''
+        n = len(input_array)
+        for i in prange(len(search_values)):
+            value = search_values[i]
+            low, high = 0, n
+            while low < high:
+                middle = (low + high) >> 1
+                if input_array[sorter_array[middle]] < value:
+                    low = middle + 1
+                else:
+                    high = middle
+            if low < n and input_array[sorter_array[low]] == value:
+                out[i] = sorter_array[low]
+            else:
+                out[i] = -1
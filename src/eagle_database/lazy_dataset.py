@@ -0,0 +1,237 @@
+import zlib
+import numpy as np
+from h5py import h5s
+from os import cpu_count
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+
+# Minimum average length of the runs of consecutive indices in a selection for
+# them to be read as a union of hyperslabs, rather than as individual points
+MIN_AVERAGE_RUN_LENGTH = 4
+
+class LazyDataset:
+
+    def __init__(self, dataset):
+        '''
+        Thin wrapper around an h5py dataset that defers reading its values
+        until they are requested.
+
+        Parameters
+        ----------
+        dataset : h5py.Dataset
+            Handle to the dataset in the open database file.
+
+        Returns
+        --------
+        None
+        '''
+        self._dataset = dataset
+        self._array   = None
+
+        # Prevents the dataset being read twice when materialized from
+        # several threads (e.g. while being prefetched)
+        self._lock    = Lock()
+
+    def materialize(self):
+        '''
+        Reads the full dataset into memory (only once) and returns it as a
+        NumPy array. Values are read directly into a preallocated buffer, one
+        chunk at a time for chunked datasets, to avoid holding two copies at once.
+
+        Returns
+        --------
+        ArrayType
+            The values of the dataset.
+        '''
+        if self._array is None:
+            with self._lock:
+                if self._array is None:
+                    array = np.empty(self.shape, dtype=self.dtype)
+                    if self._dataset.chunks is None or array.size == 0:
+                        self._dataset.read_direct(array)
+                    elif self.is_gzip_only:
+                        self._read_gzip_chunks(array)
+                    else:
+                        # Read each chunk straight into the buffer, without temporaries
+                        for chunk in self._dataset.iter_chunks():
+                            self._dataset.read_direct(array, source_sel=chunk, dest_sel=chunk)
+                    self._array = array
+
+        return self._array
+
+    def release(self):
+        '''
+        Drops the in-memory copy of the dataset, if any. Values are read from
+        the file again when next requested.
+        '''
+        with self._lock:
+            self._array = None
+
+    def _read_gzip_chunks(self, array):
+        '''
+        Fills array with the values of a gzip-compressed dataset. The raw chunks
+        are read one by one, and decompressed in parallel threads (zlib releases
+        the GIL), rather than through HDF5's single-threaded filter pipeline.
+
+        Parameters
+        ----------
+        array : ArrayType
+            Preallocated buffer with the shape and dtype of the dataset.
+
+        Returns
+        --------
+        None
+        '''
+        chunk_shape = self._dataset.chunks
+
+        def decompress(chunk, filter_mask, raw_chunk):
+            # Skipped filters are flagged in the filter mask
+            if filter_mask == 0:
+                raw_chunk = zlib.decompress(raw_chunk)
+            values = np.frombuffer(raw_chunk, dtype=self.dtype).reshape(chunk_shape)
+
+            # Edge chunks are stored with their full size
+            array[chunk] = values[tuple(slice(0, s.stop - s.start) for s in chunk)]
+
+        with ThreadPoolExecutor(max_workers=cpu_count()) as executor:
+            futures = []
+            for chunk in self._dataset.iter_chunks():
+                offsets = tuple(s.start for s in chunk)
+                try:
+                    filter_mask, raw_chunk = self._dataset.id.read_direct_chunk(offsets)
+                except (RuntimeError, OSError):
+                    # Chunks never written to are not allocated, and hold the fill value
+                    self._dataset.read_direct(array, source_sel=chunk, dest_sel=chunk)
+                    continue
+                futures.append(executor.submit(decompress, chunk, filter_mask, raw_chunk))
+
+            for future in futures:
+                future.result()
+
+    def take(self, indices, order=None):
+        '''
+        Returns the entries at the specified (unique) array indices, in the order
+        given. Only these entries are read from disk if the dataset is not in
+        memory.
+
+        Parameters
+        ----------
+        indices : ArrayType
+            Array indices of the entries to retrieve.
+        order : ArrayType, opt
+            Indices that sort the array indices, i.e. np.argsort(indices), if
+            already known. Computed here if needed otherwise.
+
+        Returns
+        --------
+        ArrayType
+            The values of the dataset at the specified indices.
+        '''
+        if self._array is not None:
+            return self._array[indices]
+
+        indices = np.asarray(indices)
+        values  = np.empty((len(indices),) + self.shape[1:], dtype=self.dtype)
+        if len(indices) == 0:
+            return values
+
+        # HDF5 selections need to be in increasing order. If they already are,
+        # values are read straight into the output buffer
+        if order is None:
+            if np.all(indices[1:] > indices[:-1]):
+                # Increasing indices without gaps are read as a single hyperslab
+                if indices[-1] - indices[0] == len(indices) - 1:
+                    self._dataset.read_direct(values, source_sel=np.s_[indices[0]:indices[-1] + 1])
+                else:
+                    self._read_sorted(indices, values)
+                return values
+            order = np.argsort(indices)
+
+        sorted_values = np.empty_like(values)
+        self._read_sorted(indices[order], sorted_values)
+        values[order] = sorted_values
+
+        return values
+
+    def _read_sorted(self, indices, out):
+        '''
+        Reads the entries at the specified (increasing) array indices into out.
+        Runs of consecutive indices, common in merger trees, are selected as
+        hyperslabs through the low-level HDF5 interface, which avoids going through
+        each point individually.
+
+        Parameters
+        ----------
+        indices : ArrayType
+            Increasing array indices of the entries to read.
+        out : ArrayType
+            Preallocated buffer where values are written to.
+
+        Returns
+        --------
+        None
+        '''
+        run_starts = np.flatnonzero(np.diff(indices) != 1) + 1
+        if len(indices) < MIN_AVERAGE_RUN_LENGTH * (len(run_starts) + 1):
+            self._dataset.read_direct(out, source_sel=np.s_[indices])
+            return
+
+        starts = indices[np.r_[0, run_starts]].tolist()
+        counts = np.diff(np.r_[0, run_starts, len(indices)]).tolist()
+
+        file_space = self._dataset.id.get_space()
+        file_space.select_none()
+        for start, count in zip(starts, counts):
+            file_space.select_hyperslab((start,) + (0,) * (len(self.shape) - 1),
+                                        (count,) + self.shape[1:], op=h5s.SELECT_OR)
+
+        self._dataset.id.read(h5s.create_simple(out.shape), file_space, out)
+
+    def __getitem__(self, key):
+        # Use the in-memory copy if available, otherwise read only the
+        # requested selection (hyperslab) from the file.
+        if self._array is not None:
+            return self._array[key]
+        return self._dataset[key]
+
+    def __array__(self, dtype=None, copy=None):
+        # The in-memory copy is shared by everything reading this dataset, so it is
+        # only returned without copying when the caller allows it (copy=None or False)
+        array = self.materialize()
+        if dtype is not None and np.dtype(dtype) != array.dtype:
+            if copy is False:
+                raise ValueError('Unable to avoid copy while converting the dataset to %s.'%np.dtype(dtype))
+            return array.astype(dtype)
+        if copy:
+            return array.copy()
+        return array
+
+    def __len__(self):
+        return len(self._dataset)
+
+    @property
+    def is_materialized(self):
+        return self._array is not None
+
+    @property
+    def dataset(self):
+        return self._dataset
+
+    @property
+    def is_gzip_only(self):
+        # Whether gzip is the only filter applied to the chunks of this dataset
+        dataset = self._dataset
+        return (dataset.compression == 'gzip' and not dataset.shuffle and not dataset.fletcher32
+                and dataset.scaleoffset is None)
+
+    @property
+    def shape(self):
+        return self._dataset.shape
+
+    @property
+    def dtype(self):
+        return self._dataset.dtype
+
+    @property
+    def nbytes(self):
+        return self._dataset.size * self._dataset.dtype.itemsize
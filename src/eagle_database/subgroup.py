@@ -1,10 +1,54 @@
 import matplotlib.pyplot as plt
-from .helper_functions import quick_search
-from numpy import where, arange, asarray, hstack, zeros, diff
+from functools import partial
+from .helper_functions import quick_search, is_contiguous_range, walk_descendants, first_gap
+from numpy import arange, empty, broadcast_arrays, atleast_1d, dtype, argsort, ascontiguousarray, stack, unique, concatenate, cumsum, asarray, int64
+
+# Layout of the merger tree information of a group of objects
+MERGER_TREE_DTYPE = dtype([('galaxyID', 'i8'), ('positional_index', 'i8'), ('nodeIndex', 'i8')])
+
+class _slot_cached_property:
+    '''
+    Equivalent of functools.cached_property for classes without an instance
+    dictionary. The value is computed on first access and stored in the slot 
+    named _cached_<name>, which the class needs to declare.
+    '''
+    def __init__(self, function):
+        self._function = function
+        self.__doc__   = function.__doc__
+
+    def __set_name__(self, owner, name):
+        self._slot = owner.__dict__['_cached_%s'%name]
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        try:
+            return self._slot.__get__(instance, owner)
+        except AttributeError:
+            value = self._function(instance)
+            self._slot.__set__(instance, value)
+            return value
+
+    def __set__(self, instance, value):
+        self._slot.__set__(instance, value)
+
+# Values of Subgroup that are only computed when first needed
+_CACHED_PROPERTIES = ('nodeIndex', 'galaxyID', 'topLeafID', 'lastProgenitorID', 'main_progenitors',
+                      'descendants', 'main_merger_tree', '_main_merger_tree_slice',
+                      '_main_merger_tree_positional_index', '_main_merger_tree_order', 'last_resolved_snapshot')
 
 # TODO: useful to get number of progenitors
 class Subgroup:
 
+    # Attributes are stored in slots rather than an instance dictionary, including
+    # those only computed when first needed
+    __slots__ = ('_database', '_subgroup_number', '_snap_number', '_positional_index', 'evolution') + \
+                tuple('_cached_%s'%name for name in _CACHED_PROPERTIES)
+
+    # Floating point dtype used to store the evolution of properties, e.g. float32 
+    # to halve their memory usage. If None, the dtype stored in the database is kept.
+    EVOLUTION_FLOAT_DTYPE = None
+
     def __init__(self, database, subgroup_number, snap_number):
         """
         Creates a Sugroup object used to retrieve information about its past
@@ -36,36 +80,65 @@ class Subgroup:
 
         #-------------------------------------------------------------------------
         # Retrieve additional properties required to get time evolution of
-        # propenitors/descendants of this subgroup
+        # propenitors/descendants of this subgroup. Its identifiers are only 
+        # retrieved when first needed.
         #-------------------------------------------------------------------------
         self._positional_index = self.get_positional_index() 
-        self._nodeIndex        = self.get_nodeIndex()
-        self._galaxyID         = self.get_galaxyID()
-        self._topLeafID        = self.get_topLeafID()
-        self._lastProgenitorID = self.get_lastProgenitorID()
-        
-        #-------------------------------------------------------------------------
-        # Getting main progenitor branch, descendants and joining them
-        # for this subgroup's full time evolution.
-        #-------------------------------------------------------------------------
-        self._main_progenitors = self.get_main_progenitors()
-        self._descendants      = self.get_descendants()
-        self._main_merger_tree = self.build_main_merger_tree()
 
         #-------------------------------------------------------------------------
         # Dictonary where this subgroup's  property evolution will be 
         #-------------------------------------------------------------------------
         self.evolution = {}
 
-        # Load by default the time information of this merger tree
-        self.evolution['aExp'    ]  = self._database.aExp     [self['SnapNum']]
-        self.evolution['Redshift']  = self._database.redshifts[self['SnapNum']]
-        self.evolution['tUniverse'] = self._database.tUniverse[self['SnapNum']]
+    @classmethod
+    def from_batch(cls, database, subgroup_numbers, snap_numbers):
+        '''
+        Creates several Subgroup objects at once. Their location and identifiers
+        are retrieved for all of them together, rather than one at a time.
 
-        self.main_progenitor_branch_length = self.evolution['aExp'].shape[0]
-        
-        # Identify if and when group is lost from the catalogues
-        self._last_resolved_snapshot = self.identify_last_resolved_snapshot()
+        Parameters
+        -----------
+        database : ObjectType
+            Object initialised through the Database class where the Subgroups of
+            interest are located
+        subgroup_numbers : ArrayType
+            Number of each subgroup to track. This is the absolute position in the 
+            catalogue.
+        snap_numbers : ArrayType
+            Snapshot number that each subgroup is located in. 
+
+        Returns
+        --------
+        list
+            The Subgroup objects, in the same order as the input.
+        '''
+        # Empty lists would otherwise be float arrays, which cannot be used as indices
+        subgroup_numbers, snap_numbers = broadcast_arrays(atleast_1d(asarray(subgroup_numbers, dtype=int64)),
+                                                          atleast_1d(asarray(snap_numbers, dtype=int64)))
+
+        positional_indices = database.subgroup_to_positional_index(subgroup_numbers, snap_numbers)
+        subgroup_numbers   = subgroup_numbers.tolist()
+        snap_numbers       = snap_numbers.tolist()
+        nodeIndex          = database.materialize('MergerTree/nodeIndex' )[positional_indices].tolist()
+        galaxyID           = database.materialize('MergerTree/GalaxyID'  )[positional_indices].tolist()
+        topLeafID          = database.materialize('MergerTree/TopLeafID' )[positional_indices].tolist()
+        lastProgenitorID   = database.materialize('MergerTree/LastProgID')[positional_indices].tolist()
+
+        subgroups = []
+        for i in range(len(positional_indices)):
+            subgroup = cls.__new__(cls)
+            subgroup._database         = database
+            subgroup._subgroup_number  = subgroup_numbers[i]
+            subgroup._snap_number      = snap_numbers[i]
+            subgroup._positional_index = positional_indices[i]
+            subgroup.nodeIndex         = nodeIndex[i]
+            subgroup.galaxyID          = galaxyID[i]
+            subgroup.topLeafID         = topLeafID[i]
+            subgroup.lastProgenitorID  = lastProgenitorID[i]
+            subgroup.evolution         = {}
+            subgroups.append(subgroup)
+
+        return subgroups
 
     #=============================================================================
     # Methods to get a hold of this object's info
@@ -76,33 +149,33 @@ class Subgroup:
         '''
         Returns the array index where the object of interest is stored.
         '''
-        return where(self._database['Subhalo/SnapNum'] == self._snap_number)[0][self._subgroup_number]
+        return self._database.subgroup_to_positional_index(self._subgroup_number, self._snap_number)
 
     def get_nodeIndex(self):
         '''
         Returns the nodeIndex of the tracked subgroup, given by:
         snap_number * 1e12 + file_number * 1e8 + subgroup_number_in_file
         '''
-        return self._database['MergerTree/nodeIndex'][self._positional_index]
+        return int(self._database.materialize('MergerTree/nodeIndex')[self._positional_index])
 
     def get_galaxyID(self):
         '''
         Returns the unique identifier as given in the depth-first database.
         '''
-        return self._database['MergerTree/GalaxyID'][self._positional_index]
+        return int(self._database.materialize('MergerTree/GalaxyID')[self._positional_index])
     
     def get_topLeafID(self):
         '''
         Returns the galaxyID of this group's earliest redshift main progenitor.
         '''
-        return self._database['MergerTree/TopLeafID'][self._positional_index]
+        return int(self._database.materialize('MergerTree/TopLeafID')[self._positional_index])
 
     def get_lastProgenitorID(self):
         '''
         Returns the maximum galaxyID of the progenitors of this group, regardless of 
         progenitor branch.
         '''
-        return self._database['MergerTree/LastProgID'][self._positional_index]
+        return int(self._database.materialize('MergerTree/LastProgID')[self._positional_index])
     
     #=============================================================================
     # Methods related to merger tree descendants/progenitor identification
@@ -113,7 +186,20 @@ class Subgroup:
         Returns the main progenitors of the subgroup
         '''
 
-        all_progenitor_galaxyIDs = arange(self._galaxyID,self._topLeafID+1)
+        # Subgroups without progenitors are their own top leaf, and need no search
+        if self.topLeafID == self.galaxyID:
+            return self.get_positional_index_info(arange(self._positional_index, self._positional_index + 1))
+
+        # If galaxyIDs are stored in ascending order, the main progenitors are stored
+        # right after this subgroup whenever the last entry of that range is its top leaf
+        number_progenitors    = self.topLeafID - self.galaxyID + 1
+        last_positional_index = self._positional_index + number_progenitors - 1
+        galaxyIDs             = self._database.materialize('MergerTree/GalaxyID')
+        if (self._database.galaxyID_sorter is None and last_positional_index < len(galaxyIDs)
+                and galaxyIDs[last_positional_index] == self.topLeafID):
+            return self.get_positional_index_info(arange(self._positional_index, last_positional_index + 1))
+
+        all_progenitor_galaxyIDs = arange(self.galaxyID,self.topLeafID+1)
         return self.get_galaxyID_info(all_progenitor_galaxyIDs) 
     
     def get_next_descendant(self, galaxyID):
@@ -124,34 +210,47 @@ class Subgroup:
         -----------
         galaxyID : int
             galaxyID of the subgroup we want to find the descendant of
+
+        Returns
+        -----------
+        int
+            galaxyID of the descendant, or -1 if there is none
         '''
         # Find entry corresponding to current galaxyID
-        positional_index = quick_search(self._database['MergerTree/GalaxyID'], galaxyID,
-                                        self._database._galaxyID_sorter)
+        positional_index = self._database.galaxyID_to_positional_index(galaxyID)
 
-        descendant_galaxyID = self._database['MergerTree/DescendantID'][positional_index]
+        descendant_galaxyID = self._database.materialize('MergerTree/DescendantID')[positional_index]
 
-        return descendant_galaxyID
+        return int(descendant_galaxyID)
 
     def get_descendants(self):
         '''
         Gets the galaxyID,positional index and nodeIndex of this subgroup's
         descendants.
         '''
-
-        # Iteratively find all descendant galaxyIDs 
-        all_descendant_galaxyIDs = []
-        next_galaxyID = self.get_next_descendant(self._galaxyID) 
-        while next_galaxyID != -1:
-            all_descendant_galaxyIDs.append(next_galaxyID[0])
-            next_galaxyID    = self.get_next_descendant(next_galaxyID) 
-        if not all_descendant_galaxyIDs:
+        # Follow the array index of the descendant of each entry if it has already been
+        # computed. Otherwise, searching for the few descendants of this subgroup is much 
+        # cheaper than computing it for the whole database.
+        if 'descendant_positional_index' in vars(self._database):
+            all_descendant_positional_indices = walk_descendants(self._positional_index,
+                                                                 self._database.descendant_positional_index,
+                                                                 self._database.number_snapshots)
+        else:
+            descendantIDs = self._database.materialize('MergerTree/DescendantID')
+            all_descendant_positional_indices = []
+            descendant_galaxyID = int(descendantIDs[self._positional_index])
+            while descendant_galaxyID != -1 and len(all_descendant_positional_indices) < self._database.number_snapshots:
+                positional_index    = self._database.galaxyID_to_positional_index(descendant_galaxyID)
+                descendant_galaxyID = int(descendantIDs[positional_index])
+                all_descendant_positional_indices.append(positional_index)
+            all_descendant_positional_indices = asarray(all_descendant_positional_indices, dtype=int64)
+        if len(all_descendant_positional_indices) == 0:
             return None
         
-        # Collect results into a dict and return
-        descendant_dict = self.get_galaxyID_info(asarray(all_descendant_galaxyIDs)[::-1])
+        # Collect results into a structured array and return
+        descendant_info = self.get_positional_index_info(all_descendant_positional_indices[::-1])
         
-        return descendant_dict
+        return descendant_info
     
     def build_main_merger_tree(self):
         '''
@@ -159,17 +258,30 @@ class Subgroup:
         the full time evolution of the group.
         '''
         # Method used to reconstruct evolution (past and future) of given object
-        if self._main_progenitors is None:
-            main_evolutionary_tree = self._descendants
-        elif self._descendants is None:
-            main_evolutionary_tree = self._main_progenitors
+        if self.main_progenitors is None:
+            main_evolutionary_tree = self.descendants
+        elif self.descendants is None:
+            main_evolutionary_tree = self.main_progenitors
         else:
-            
-            main_evolutionary_tree = {}
-            for key in self._main_progenitors.keys():
-                main_evolutionary_tree[key] = hstack([self._descendants[key], self._main_progenitors[key]])
+            # Fill a preallocated array, with descendants first
+            number_descendants  = len(self.descendants)
+            number_progenitors  = len(self.main_progenitors)
+
+            main_evolutionary_tree = empty(number_descendants + number_progenitors, dtype=MERGER_TREE_DTYPE)
+            main_evolutionary_tree[:number_descendants] = self.descendants
+            main_evolutionary_tree[number_descendants:] = self.main_progenitors
         return main_evolutionary_tree
 
+    def get_main_merger_tree_slice(self):
+        '''
+        Returns a slice spanning the positional indices of the main merger tree 
+        if they are stored contiguously in the database, or None otherwise. This 
+        allows its properties to be read as a single block.
+        '''
+        positional_index = self.main_merger_tree['positional_index']
+        if is_contiguous_range(positional_index):
+            return slice(int(positional_index[0]), int(positional_index[-1]) + 1)
+
     def identify_last_resolved_snapshot(self):
         '''
         It identifies when the main branch of this subgroup ends, e.g
@@ -178,19 +290,15 @@ class Subgroup:
         '''
 
         # Make use of the fact that main branch galaxyID values are separated 
-        # by 1.
-        cumulative_galaxyID_diff = diff(self.main_merger_tree['galaxyID'])
-
-
-        # Find where and if the group is lost from merger trees
-        lost_positional_index = where(cumulative_galaxyID_diff != 1)[0]
+        # by 1, and find where and if the group is lost from merger trees
+        lost_positional_index = first_gap(self.main_merger_tree['galaxyID'])
 
         # Group has not been lost case
-        if len(lost_positional_index) == 0:
+        if lost_positional_index == -1:
             return -1
         else: 
-            last_resolved_galaxyID = self.main_merger_tree['galaxyID'][lost_positional_index[0]+1]
-            return self['SnapNum'][lost_positional_index[0]+1]
+            positional_index = self.main_merger_tree['positional_index'][lost_positional_index]
+            return int(self._database.materialize('Subhalo/SnapNum')[positional_index])
 
     #=============================================================================
     # Methods to retrieve evolution of properties
@@ -207,25 +315,193 @@ class Subgroup:
         '''
         if property not in self.evolution:
 
-            # Handling 3D quantities that have been split into different dimensions 
-            if (property == 'CentreOfPotential') or (property == 'Velocity'):
-                self.evolution[property] = zeros((len(self.evolution['aExp']),3))
-                for i, coord in enumerate(['x','y','z']):
-                    self.evolution[property][:,i] = self.get_property_evolution('%s_%s'%(property,coord))
+            # SnapNum is already in memory, as it is used to locate subgroups
+            if property == 'SnapNum':
+                self.evolution[property] = self._database.materialize('Subhalo/SnapNum')[self._main_merger_tree_positional_index]
+
+            # Time information of the main merger tree
+            elif property in ('aExp', 'Redshift', 'tUniverse'):
+                times = {'aExp'     : self._database.aExp,
+                         'Redshift' : self._database.redshifts,
+                         'tUniverse': self._database.tUniverse}[property]
+                self.evolution[property] = times[self['SnapNum']]
+
+            # Handling 3D quantities that have been split into different dimensions,
+            # unless they are stored as a single (N,3) dataset
+            elif ((property == 'CentreOfPotential') or (property == 'Velocity')) and \
+                    property not in self._database.subhalo_properties:
+                # Each component is read straight into its column, without also
+                # being stored separately
+                components = ['Subhalo/%s_%s'%(property,coord) for coord in ['x','y','z']]
+                self.evolution[property] = empty((self.main_progenitor_branch_length,3),
+                                                 dtype=self._database[components[0]].dtype)
+                for i, component in enumerate(components):
+                    self.evolution[property][:,i] = self.get_main_merger_tree_values(component)
             else:
-                self.evolution[property] = self._database['Subhalo/%s'%property][()][self._main_merger_tree['positional_index']]
+                group_name = self._database.get_subhalo_group_name(property)
+                self.evolution[property] = self.get_main_merger_tree_values(group_name)
+
+            # Integer quantities (e.g. SnapNum) are always kept as they are
+            if self.EVOLUTION_FLOAT_DTYPE is not None and self.evolution[property].dtype.kind == 'f':
+                self.evolution[property] = self.evolution[property].astype(self.EVOLUTION_FLOAT_DTYPE, copy=False)
 
         return self.evolution[property]
 
+    def get_property_evolutions(self, properties):
+        '''
+        Retrieves main progenitor branch evolution of several properties at once,
+        sharing the selection of main merger tree entries between them.
+        
+        Parameters
+        -----------
+        properties: list of str
+            Names of the properties to retrieve
+
+        Returns
+        --------
+        dict
+            Evolution of each of the specified properties.
+        '''
+        return {property: self.get_property_evolution(property) for property in properties}
+
+    def prefetch_property_evolutions(self, properties):
+        '''
+        Starts reading, in the background, the values needed to retrieve the evolution 
+        of several properties, e.g. while another subgroup is being processed. 
+        
+        Parameters
+        -----------
+        properties: list of str
+            Names of the properties to retrieve later on.
+
+        Returns
+        --------
+        None
+        '''
+        for property in properties:
+
+            # Time information is already in memory
+            if property in self.evolution or property in ('SnapNum', 'aExp', 'Redshift', 'tUniverse'):
+                continue
+
+            if ((property == 'CentreOfPotential') or (property == 'Velocity')) and \
+                    property not in self._database.subhalo_properties:
+                group_names = ['Subhalo/%s_%s'%(property,coord) for coord in ['x','y','z']]
+            else:
+                group_names = [self._database.get_subhalo_group_name(property)]
+
+            for group_name in group_names:
+                if not self._database[group_name].is_materialized:
+                    self._database.prefetch_selection(group_name, self._main_merger_tree_positional_index,
+                                                      self._main_merger_tree_order)
+
+    @classmethod
+    def get_property_evolution_bulk(cls, subgroups, property):
+        '''
+        Retrieves main progenitor branch evolution of a property for several subgroups.
+        The entries of all of them are read from the database at once, rather than
+        one subgroup at a time.
+        
+        Parameters
+        -----------
+        subgroups: list of Subgroup
+            Subgroups, from the same database, whose evolution we want to retrieve.
+        property: str
+            Name of the property to retrieve
+
+        Returns
+        --------
+        list
+            Evolution of the property for each subgroup, in the same order as the input.
+        '''
+        pending = [subgroup for subgroup in subgroups if property not in subgroup.evolution]
+
+        # Quantities that are already in memory or split into components are
+        # retrieved for each subgroup separately
+        if len(pending) > 1:
+            database = pending[0]._database
+            is_split = property in ('CentreOfPotential', 'Velocity') and property not in database.subhalo_properties
+            if property not in ('SnapNum', 'aExp', 'Redshift', 'tUniverse') and not is_split:
+                positional_indices = [subgroup._main_merger_tree_positional_index for subgroup in pending]
+                unique_positional_index, inverse = unique(concatenate(positional_indices), return_inverse=True)
+
+                # Sorted and unique, so read straight from file in a single selection
+                values = database[database.get_subhalo_group_name(property)].take(unique_positional_index)
+                if cls.EVOLUTION_FLOAT_DTYPE is not None and values.dtype.kind == 'f':
+                    values = values.astype(cls.EVOLUTION_FLOAT_DTYPE, copy=False)
+
+                offsets = cumsum([0] + [len(positional_index) for positional_index in positional_indices])
+                for i, subgroup in enumerate(pending):
+                    subgroup.evolution[property] = values[inverse[offsets[i]:offsets[i+1]]]
+
+        return [subgroup.get_property_evolution(property) for subgroup in subgroups]
+
+    def stack_property_evolutions(self, properties):
+        '''
+        Retrieves main progenitor branch evolution of several properties as the
+        rows of a single contiguous array, e.g. to combine them in NumPy operations.
+        
+        Parameters
+        -----------
+        properties: list of str
+            Names of the properties to retrieve
+
+        Returns
+        --------
+        ArrayType
+            Array with the evolution of each property along its first axis.
+        '''
+        evolutions = self.get_property_evolutions(properties)
+        return stack([evolutions[property] for property in properties])
+
+    def get_evolution_as_struct(self, properties=None):
+        '''
+        Returns the evolution of several properties as a structured array, with one
+        entry per main merger tree object and one field per property.
+        
+        Parameters
+        -----------
+        properties: list of str, opt
+            Names of the properties to include. If None (default), all properties 
+            retrieved so far are included.
+
+        Returns
+        --------
+        ArrayType
+            Structured array with the evolution of each property as a field.
+        '''
+        if properties is None:
+            properties = list(self.evolution)
+        evolutions = self.get_property_evolutions(properties)
+
+        # 3D quantities are stored as subarrays of each entry
+        struct_dtype = dtype([(property, evolutions[property].dtype, evolutions[property].shape[1:])
+                              for property in properties])
+        struct       = empty(self.main_progenitor_branch_length, dtype=struct_dtype)
+        for property in properties:
+            struct[property] = evolutions[property]
+
+        return struct
+
     def __getitem__(self, property):
         self.get_property_evolution(property)
         return self.evolution[property]
 
+    def __getattr__(self, name):
+        # Provides get_<property>() methods for the properties available in the 
+        # database, e.g. get_Mass(), bound to the property they retrieve
+        if name.startswith('get_'):
+            property = name[4:]
+            if property in ('aExp', 'Redshift', 'tUniverse', 'CentreOfPotential', 'Velocity') or \
+                    property in self._database.subhalo_properties:
+                return partial(self.get_property_evolution, property)
+        raise AttributeError("'%s' object has no attribute '%s'"%(type(self).__name__, name))
+
     #=============================================================================
     # Helper methods (plotting and searching)
     #=============================================================================
 
-    def plot_evolution(self, x_axis, y_axis, x_scale = 'linear', y_scale = 'linear'):
+    def plot_evolution(self, x_axis, y_axis, x_scale = 'linear', y_scale = 'linear', ax = None):
         '''
         Helper function to plot the time evolution of a specified quantity.
 
@@ -240,25 +516,63 @@ class Subgroup:
             Scale of x_axis, either linear (default) or log.
         y_scale : str, opt
             Scale of y_axis, either linear (default) or log.
+        ax : matplotlib.axes.Axes, opt
+            Axes to plot into, e.g. to overlay several subgroups. If None (default),
+            a new figure is created and shown.
         
         Returns
         -----------
-        int
-            0 on sucessfull execution
+        matplotlib.axes.Axes
+            The axes containing the plot.
         '''
 
-        fig, ax1 = plt.subplots(1)
+        show = ax is None
+        if show:
+            fig, ax = plt.subplots(1)
         # Plot quantity
-        ax1.plot(self[x_axis],self[y_axis])
+        ax.plot(self[x_axis],self[y_axis])
         # Set scale
-        ax1.set_xscale(x_scale)
-        ax1.set_yscale(y_scale)
+        ax.set_xscale(x_scale)
+        ax.set_yscale(y_scale)
         # Set labels
-        ax1.set_xlabel(x_axis)
-        ax1.set_ylabel(y_axis)
-        plt.show()
+        ax.set_xlabel(x_axis)
+        ax.set_ylabel(y_axis)
+        if show:
+            plt.show()
+
+        return ax
 
-        return 0
+    def get_main_merger_tree_values(self, group_name):
+        '''
+        Reads the entries of a database dataset corresponding to the main merger
+        tree of this subgroup, without reading the rest of the dataset.
+
+        Parameters
+        ----------
+        group_name : str
+            Name of the dataset to read from.
+
+        Returns
+        ----------
+        ArrayType
+            Values of the dataset along the main merger tree.
+        '''
+        # Values already in memory are shared with other subgroups. Copied, so
+        # the full dataset can be freed when dropped from the cache
+        dataset = self._database[group_name]
+        if dataset.is_materialized:
+            if self._main_merger_tree_slice is not None:
+                return dataset[self._main_merger_tree_slice].copy()
+            return dataset.take(self._main_merger_tree_positional_index, self._main_merger_tree_order)
+
+        # Contiguous ranges can be read directly from the file, unless they have
+        # already been requested in the background
+        positional_index = self._main_merger_tree_positional_index
+        if self._main_merger_tree_slice is not None and not self._database.has_selection(group_name, positional_index):
+            return self._database._get_slice(group_name, self._main_merger_tree_slice.start,
+                                             self._main_merger_tree_slice.stop)
+
+        return self._database.get_selection(group_name, positional_index, self._main_merger_tree_order)
 
     def get_galaxyID_info(self, galaxyID_array):
         '''
@@ -271,19 +585,43 @@ class Subgroup:
 
         Returns
         ----------
-        galaxyID_info : dict
-            Dictionary holding where to locate galaxyID in this database file (positional_index)
+        galaxyID_info : ArrayType
+            Structured array holding where to locate galaxyID in this database file (positional_index)
             and the corresponding nodeIndex of these objects (nodeIndex).
         '''
 
-        galaxyID_info = {}
+        galaxyID_info = empty(len(galaxyID_array), dtype=MERGER_TREE_DTYPE)
         galaxyID_info['galaxyID']         = galaxyID_array
-        galaxyID_info['positional_index'] = quick_search(self._database['MergerTree/GalaxyID'],
-                                                         galaxyID_array, self._database._galaxyID_sorter)
-        galaxyID_info['nodeIndex']        = self._database['MergerTree/nodeIndex'][galaxyID_info['positional_index']] 
+        galaxyID_info['positional_index'] = quick_search(self._database.materialize('MergerTree/GalaxyID'),
+                                                         galaxyID_array, self._database.galaxyID_sorter)
+        galaxyID_info['nodeIndex']        = self._database.materialize('MergerTree/nodeIndex')[galaxyID_info['positional_index']] 
         
         return galaxyID_info
     
+    def get_positional_index_info(self, positional_index_array):
+        '''
+        Retrieves galaxyID and nodeIndex of the objects stored at the specified 
+        array indices.
+
+        Parameters
+        ----------
+        positional_index_array : ArrayType
+            Array indices of the objects in this database file.
+
+        Returns
+        ----------
+        positional_index_info : ArrayType
+            Structured array holding the galaxyID, positional_index and nodeIndex of 
+            these objects.
+        '''
+
+        positional_index_info = empty(len(positional_index_array), dtype=MERGER_TREE_DTYPE)
+        positional_index_info['galaxyID']         = self._database.materialize('MergerTree/GalaxyID')[positional_index_array]
+        positional_index_info['positional_index'] = positional_index_array
+        positional_index_info['nodeIndex']        = self._database.materialize('MergerTree/nodeIndex')[positional_index_array]
+
+        return positional_index_info
+
     #=============================================================================
     # Property definitions
     #=============================================================================
@@ -296,34 +634,63 @@ class Subgroup:
     def snap_number(self):
         return self._snap_number
     
-    @property
+    @_slot_cached_property
     def nodeIndex(self):
-        return self._nodeIndex
+        return self.get_nodeIndex()
     
-    @property
+    @_slot_cached_property
     def galaxyID(self):
-        return self._galaxyID
+        return self.get_galaxyID()
     
-    @property
+    @_slot_cached_property
     def topLeafID(self):
-        return self._topLeafID
+        return self.get_topLeafID()
 
-    @property
+    @_slot_cached_property
     def lastProgenitorID(self):
-        return self._lastProgenitorID
+        return self.get_lastProgenitorID()
 
     @property
+    def main_progenitor_branch_length(self):
+        return len(self.main_merger_tree)
+
+    #-----------------------------------------------------------------------------
+    # Getting main progenitor branch, descendants and joining them for this 
+    # subgroup's full time evolution. These are only computed when first needed.
+    #-----------------------------------------------------------------------------
+
+    @_slot_cached_property
     def main_progenitors(self):
-        return self._main_progenitors
+        return self.get_main_progenitors()
 
-    @property
+    @_slot_cached_property
     def descendants(self):
-        return self._main_progenitors
+        return self.get_descendants()
 
-    @property
+    @_slot_cached_property
     def main_merger_tree(self):
-        return self._main_merger_tree
+        return self.build_main_merger_tree()
+
+    @_slot_cached_property
+    def _main_merger_tree_slice(self):
+        # Slice equivalent to the positional indices of the tree, if they are contiguous
+        return self.get_main_merger_tree_slice()
+
+    @_slot_cached_property
+    def _main_merger_tree_positional_index(self):
+        # Contiguous copy of the positional indices of the tree, as the field of
+        # the structured array is strided and copied whenever used as an index
+        return ascontiguousarray(self.main_merger_tree['positional_index'])
+
+    @_slot_cached_property
+    def _main_merger_tree_order(self):
+        # Order in which entries of the tree are read from file, or None if already ascending
+        positional_index = self._main_merger_tree_positional_index
+        if (positional_index[1:] > positional_index[:-1]).all():
+            return None
+        return argsort(positional_index)
     
-    @property
+    @_slot_cached_property
     def last_resolved_snapshot(self):
-        return self._last_resolved_snapshot
\ No newline at end of file
+        # Identify if and when group is lost from the catalogues
+        return self.identify_last_resolved_snapshot()